@@ -1,8 +1,10 @@
 import os
 import sys
 import sqlite3
-from typing import Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
 
+import numpy as np
 import pandas as pd
 
 # Ensure imports from scripts directory
@@ -10,7 +12,17 @@ SCRIPT_DIR = os.path.dirname(__file__)
 if SCRIPT_DIR not in sys.path:
     sys.path.append(SCRIPT_DIR)
 
-from coverage_scan_single import nba_career_by_season, db_career_by_season, METRICS, DB_PATH
+from coverage_scan_single import (
+    nba_career_by_season,
+    db_career_by_season_bulk,
+    configure_sqlite,
+    ensure_indexes,
+    INT_DTYPE,
+    METRICS,
+    NBA_COLS,
+    DB_COLS,
+    DB_PATH,
+)
 
 
 def ensure_table(conn: sqlite3.Connection) -> None:
@@ -33,71 +45,106 @@ def ensure_table(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def upsert_override(conn: sqlite3.Connection, player_id: str, season: str, deltas: dict) -> None:
+UPSERT_SQL = """
+    INSERT INTO season_totals_override (player_id, season, season_type, points, rebounds, assists, steals, blocks)
+    VALUES (?, ?, 'Regular Season', ?, ?, ?, ?, ?)
+    ON CONFLICT(player_id, season, season_type) DO UPDATE SET
+      points=excluded.points,
+      rebounds=excluded.rebounds,
+      assists=excluded.assists,
+      steals=excluded.steals,
+      blocks=excluded.blocks
+"""
+
+# First-run bulk load into an empty table needs no conflict handling
+INSERT_SQL = """
+    INSERT INTO season_totals_override (player_id, season, season_type, points, rebounds, assists, steals, blocks)
+    VALUES (?, ?, 'Regular Season', ?, ?, ?, ?, ?)
+"""
+
+# Keep executemany batches bounded so a huge backlog doesn't build one giant statement run
+BATCH_SIZE = 500
+
+# NBA fetches are network-bound; the global pacing gate in coverage_scan_single
+# keeps the request rate capped regardless of worker count.
+MAX_WORKERS = 4
+
+
+def upsert_overrides_many(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+    """Upsert override rows in one transaction. rows: (player_id, season, pts, reb, ast, stl, blk)."""
+    if not rows:
+        return
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO season_totals_override (player_id, season, season_type, points, rebounds, assists, steals, blocks)
-        VALUES (?, ?, 'Regular Season', ?, ?, ?, ?, ?)
-        ON CONFLICT(player_id, season, season_type) DO UPDATE SET
-          points=excluded.points,
-          rebounds=excluded.rebounds,
-          assists=excluded.assists,
-          steals=excluded.steals,
-          blocks=excluded.blocks
-        """,
-        (
-            player_id,
-            season,
-            int(deltas.get("points", 0)),
-            int(deltas.get("rebounds", 0)),
-            int(deltas.get("assists", 0)),
-            int(deltas.get("steals", 0)),
-            int(deltas.get("blocks", 0)),
-        ),
-    )
+    cur.execute("SELECT 1 FROM season_totals_override LIMIT 1")
+    sql = UPSERT_SQL if cur.fetchone() else INSERT_SQL
+    cur.execute("BEGIN")
+    for i in range(0, len(rows), BATCH_SIZE):
+        cur.executemany(sql, rows[i:i + BATCH_SIZE])
+    conn.commit()
 
 
-def load_discrepant_player_ids(csv_path: str) -> Set[str]:
+def load_discrepant_player_seasons(csv_path: str) -> Dict[str, Optional[Set[str]]]:
+    """Map discrepant player_id -> set of discrepant seasons.
+
+    The all-time leaders report is career-level and has no season column; in
+    that case the value is None, meaning process the player's whole career.
+    """
     df = pd.read_csv(csv_path)
     # Keep rows with numeric non-zero deltas and a valid player_id
     df["delta"] = pd.to_numeric(df["delta"], errors="coerce").fillna(0).astype(int)
-    players = set(str(pid) for pid in df.loc[df["delta"] != 0, "player_id"].dropna().unique())
-    return players
-
-
-def process_player(conn: sqlite3.Connection, player_id: str) -> int:
-    """Compute per-season deltas (NBA - DB) and upsert non-zero overrides. Returns count of seasons updated."""
-    nba_df = nba_career_by_season(player_id)
-    db_df = db_career_by_season(conn, player_id)
+    disc = df.loc[df["delta"] != 0].dropna(subset=["player_id"])
+    if "season" in disc.columns:
+        return {
+            str(pid): set(sub["season"].astype(str))
+            for pid, sub in disc.groupby(disc["player_id"].astype(str))
+        }
+    return {str(pid): None for pid in disc["player_id"].unique()}
+
+
+def process_player(player_id: str, nba_df: Optional[pd.DataFrame] = None,
+                   db_df: Optional[pd.DataFrame] = None,
+                   seasons: Optional[Set[str]] = None) -> List[tuple]:
+    """Compute per-season deltas (NBA - DB) and stage non-zero override rows for a batched upsert.
+
+    When `seasons` is given, only those seasons are merged and compared.
+    """
+    if nba_df is None:
+        nba_df = nba_career_by_season(player_id)
     if db_df is None or db_df.empty:
-        db_df = pd.DataFrame(columns=["season"] + [dst for _, dst in METRICS])
+        db_df = pd.DataFrame(columns=["season"] + DB_COLS)
+
+    if seasons is not None:
+        nba_df = nba_df[nba_df["season"].astype(str).isin(seasons)]
+        db_df = db_df[db_df["season"].astype(str).isin(seasons)]
 
     # Normalize to common names
-    nba_df2 = nba_df.rename(columns={m: m for m, _ in METRICS})[["season"] + [m for m, _ in METRICS]]
-    db_df2 = db_df.rename(columns={dst: dst for _, dst in METRICS})[["season"] + [dst for _, dst in METRICS]]
+    nba_df2 = nba_df[["season"] + NBA_COLS]
+    db_df2 = db_df[["season"] + DB_COLS]
+
+    # Career frames can carry one row per team in trade seasons; keep one per
+    # season (last wins, which is the TOT row) so staged rows never collide on
+    # the (player_id, season, season_type) primary key
+    nba_df2 = nba_df2[~nba_df2["season"].astype(str).duplicated(keep="last")]
+    db_df2 = db_df2[~db_df2["season"].astype(str).duplicated(keep="last")]
 
     merged = pd.merge(nba_df2, db_df2, on="season", how="outer", suffixes=("_nba", "_db"))
     for m, dst in METRICS:
-        merged[f"{dst}_nba"] = pd.to_numeric(merged.get(f"{m}_nba", merged.get(m, 0)), errors="coerce").fillna(0).astype(int)
-        merged[f"{dst}_db"] = pd.to_numeric(merged.get(f"{dst}_db", merged.get(dst, 0)), errors="coerce").fillna(0).astype(int)
-
-    updated = 0
-    for _, row in merged.iterrows():
-        season = str(row["season"]) if not pd.isna(row.get("season")) else None
-        if not season:
+        merged[f"{dst}_nba"] = pd.to_numeric(merged.get(f"{m}_nba", merged.get(m, 0)), errors="coerce").fillna(0).astype(INT_DTYPE)
+        merged[f"{dst}_db"] = pd.to_numeric(merged.get(f"{dst}_db", merged.get(dst, 0)), errors="coerce").fillna(0).astype(INT_DTYPE)
+
+    # Vectorized deltas: NBA - DB across all metric columns at once
+    nba_arr = merged[[f"{d}_nba" for d in DB_COLS]].to_numpy(dtype=np.int64)
+    db_arr = merged[[f"{d}_db" for d in DB_COLS]].to_numpy(dtype=np.int64)
+    deltas_arr = nba_arr - db_arr
+    mask = (deltas_arr != 0).any(axis=1)
+    seasons = merged.loc[mask, "season"].astype(str).to_numpy()
+
+    rows: List[tuple] = []
+    for season, row_deltas in zip(seasons, deltas_arr[mask]):
+        if not season or season == "nan":
             continue
-        deltas = {}
-        nonzero = False
-        for m, dst in METRICS:
-            delta = int(row[f"{dst}_nba"]) - int(row[f"{dst}_db"])  # NBA - DB
-            deltas[dst] = delta
-            if delta != 0:
-                nonzero = True
-        if nonzero:
-            upsert_override(conn, player_id, season, deltas)
-            updated += 1
-    return updated
+        rows.append((player_id, season, *(int(d) for d in row_deltas)))
+    return rows
 
 
 def main():
@@ -106,21 +153,28 @@ def main():
         print(f"Missing report: {csv_path}. Run scripts/validate_alltime_leaders.py first.")
         sys.exit(2)
 
-    players = load_discrepant_player_ids(csv_path)
+    players = load_discrepant_player_seasons(csv_path)
     if not players:
         print("No discrepant players found in the report.")
         return
 
     conn = sqlite3.connect(DB_PATH)
     try:
+        configure_sqlite(conn)
         ensure_table(conn)
-        total_updates = 0
-        for pid in sorted(players):
-            updated = process_player(conn, pid)
-            total_updates += updated
-            print(f" - {pid}: updated {updated} season overrides")
-        conn.commit()
-        print(f"Done. Total seasons updated: {total_updates}")
+        ensure_indexes(conn)
+        all_rows: List[tuple] = []
+        pids = sorted(players)
+        # One scan of game_summary for all players instead of a query per player
+        db_map = db_career_by_season_bulk(conn, pids)
+        # Fetch NBA career stats concurrently; DB work stays on this thread.
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            for pid, nba_df in zip(pids, pool.map(nba_career_by_season, pids)):
+                rows = process_player(pid, nba_df, db_map.get(pid), players[pid])
+                all_rows.extend(rows)
+                print(f" - {pid}: staged {len(rows)} season overrides")
+        upsert_overrides_many(conn, all_rows)
+        print(f"Done. Total seasons updated: {len(all_rows)}")
     finally:
         conn.close()
 
@@ -1,15 +1,22 @@
 import os
+import re
 import sys
 import json
 import time
 import random
 import sqlite3
+import threading
+from functools import lru_cache
 from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
 DB_PATH = os.path.join("data", "app.sqlite")
 
+# Season totals fit comfortably in 32 bits; halves frame memory vs int64
+INT_DTYPE = np.int32
+
 METRICS = [
     ("PTS", "points"),
     ("REB", "rebounds"),
@@ -18,11 +25,22 @@ METRICS = [
     ("BLK", "blocks"),
 ]
 
+# Derived column-name lists, built once instead of per call site
+NBA_COLS = [m for m, _ in METRICS]
+DB_COLS = [dst for _, dst in METRICS]
+NBA_PREFIXED = [f"NBA_{m}" for m in NBA_COLS]
+DB_PREFIXED = [f"DB_{d}" for d in DB_COLS]
+DELTA_COLS = [f"DELTA_{d}" for d in DB_COLS]
+
 SLEEP_SECONDS = 1.0
 MAX_ATTEMPTS = 5
 BASE_DELAY = 0.8
 MAX_DELAY = 8.0
 
+# On-disk cache for PlayerCareerStats so re-runs skip the network entirely
+CAREER_CACHE_DIR = os.path.join("data", "cache", "career")
+CAREER_CACHE_TTL = 7 * 24 * 3600  # seconds
+
 try:
     from nba_api.stats.endpoints import playercareerstats
 except Exception:
@@ -30,28 +48,61 @@ except Exception:
     sys.exit(1)
 
 
+def install_shared_session() -> None:
+    """Reuse one pooled HTTPS session across nba_api calls so keep-alive amortizes TLS handshakes."""
+    try:
+        import requests
+        from nba_api.stats.library.http import NBAStatsHTTP
+
+        session = requests.Session()
+        session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=16),
+        )
+        if hasattr(NBAStatsHTTP, "set_session"):
+            NBAStatsHTTP.set_session(session)
+        else:
+            NBAStatsHTTP._session = session
+    except Exception:
+        # Non-fatal: fall back to nba_api's per-call connections
+        pass
+
+
+install_shared_session()
+
+
+_RETRY_RE = re.compile(
+    r"429|too many requests|timeout|timed out|connection reset|temporary"
+    r"|service unavailable|503|502|bad gateway",
+    re.IGNORECASE,
+)
+
+
 def _should_retry_error(err: Exception) -> bool:
-    msg = str(err).lower()
-    markers = [
-        "429",
-        "too many requests",
-        "timeout",
-        "timed out",
-        "connection reset",
-        "temporary",
-        "service unavailable",
-        "503",
-        "502",
-        "bad gateway",
-    ]
-    return any(m in msg for m in markers)
+    return _RETRY_RE.search(str(err)) is not None
+
+
+# Global pacing gate: callers (possibly many threads) reserve a slot so the
+# overall request rate stays at <= 1 per SLEEP_SECONDS.
+_PACE_LOCK = threading.Lock()
+_NEXT_REQUEST_AT = 0.0
+
+
+def _pace() -> None:
+    global _NEXT_REQUEST_AT
+    with _PACE_LOCK:
+        now = time.monotonic()
+        wait = _NEXT_REQUEST_AT - now
+        _NEXT_REQUEST_AT = max(now, _NEXT_REQUEST_AT) + SLEEP_SECONDS
+    if wait > 0:
+        time.sleep(wait)
 
 
 def request_with_retries(callable_fn):
     last_err = None
     for attempt in range(1, MAX_ATTEMPTS + 1):
         try:
-            time.sleep(SLEEP_SECONDS)
+            _pace()
             return callable_fn()
         except Exception as e:
             last_err = e
@@ -65,41 +116,86 @@ def request_with_retries(callable_fn):
     raise last_err
 
 
+@lru_cache(maxsize=None)
 def nba_career_by_season(player_id: str) -> pd.DataFrame:
+    cache_path = os.path.join(CAREER_CACHE_DIR, f"{player_id}.parquet")
+    try:
+        if os.path.exists(cache_path) and (time.time() - os.path.getmtime(cache_path)) < CAREER_CACHE_TTL:
+            return pd.read_parquet(cache_path)
+    except Exception:
+        pass  # unreadable cache entry: fall through to a fresh fetch
+
+    df = _fetch_career_by_season(player_id)
+    try:
+        os.makedirs(CAREER_CACHE_DIR, exist_ok=True)
+        df.to_parquet(cache_path)
+    except Exception:
+        # Non-fatal: no parquet engine installed or disk issue
+        pass
+    return df
+
+
+def _fetch_career_by_season(player_id: str) -> pd.DataFrame:
     res = request_with_retries(lambda: playercareerstats.PlayerCareerStats(player_id=player_id))
     frames = res.get_data_frames() or []
     if not frames:
-        return pd.DataFrame(columns=["season", *[m for m, _ in METRICS], "GP"])  # empty
+        return pd.DataFrame(columns=["season", *NBA_COLS, "GP"])  # empty
 
     # Find the frame with seasonal totals
-    needed_cols = {"SEASON_ID", "GP"} | {m for m, _ in METRICS}
+    needed_cols = {"SEASON_ID", "GP"} | set(NBA_COLS)
     df_match = None
     for f in frames:
-        cols = set(c.upper() for c in f.columns)
-        if needed_cols.issubset(cols):
+        if needed_cols.issubset(f.columns.str.upper()):
             df_match = f
             break
     if df_match is None:
-        return pd.DataFrame(columns=["season", *[m for m, _ in METRICS], "GP"])  # empty
+        return pd.DataFrame(columns=["season", *NBA_COLS, "GP"])  # empty
 
-    # Normalize
+    # Normalize: some nba_api frames have lowercase/varied case
     df = df_match.copy()
-    # Some nba_api frames have lowercase/varied case
-    rename_map = {c: c.upper() for c in df.columns}
-    df.rename(columns=rename_map, inplace=True)
+    df.columns = df.columns.str.upper()
     df["season"] = df["SEASON_ID"].astype(str)
     # Keep only needed columns
-    keep_cols = ["season", "GP"] + [m for m, _ in METRICS]
+    keep_cols = ["season", "GP"] + NBA_COLS
     for c in keep_cols:
         if c not in df.columns:
             df[c] = 0
     df = df[keep_cols]
-    # Ensure numeric
-    for c in ["GP"] + [m for m, _ in METRICS]:
-        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
+    # Ensure numeric: coerce all columns in one pass; int32 is plenty for season totals
+    numeric_cols = ["GP"] + NBA_COLS
+    arr = df[numeric_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    df[numeric_cols] = np.nan_to_num(arr, nan=0.0).astype(np.int32)
     return df
 
 
+def configure_sqlite(conn: sqlite3.Connection) -> None:
+    """Tune the connection for bulk work: WAL, relaxed fsync, bigger cache."""
+    for pragma in (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA mmap_size=268435456",
+    ):
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            # Non-fatal: keep defaults if the build rejects a pragma
+            pass
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> None:
+    """Covering index so the per-player season aggregates never touch the base table."""
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_gs_player_type_season
+        ON game_summary(player_id, season_type, season, points, rebounds, assists, steals, blocks)
+        """
+    )
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
 def db_career_by_season(conn: sqlite3.Connection, player_id: str) -> pd.DataFrame:
     # Aggregate from game_summary for Regular Season only
     sql = f"""
@@ -118,13 +214,48 @@ def db_career_by_season(conn: sqlite3.Connection, player_id: str) -> pd.DataFram
     # gp_rows is rows; not necessarily GP. We can't infer GP perfectly here without distinct game_id.
     # We'll leave GP blank from DB side; focus on totals for metrics.
     if df.empty:
-        df = pd.DataFrame(columns=["season", *[dst for _, dst in METRICS]])
+        df = pd.DataFrame(columns=["season", *DB_COLS])
     # Normalize types
     if not df.empty:
         df["season"] = df["season"].astype(str)
         for _, dst in METRICS:
-            df[dst] = pd.to_numeric(df[dst], errors="coerce").fillna(0).astype(int)
-    return df[["season"] + [dst for _, dst in METRICS]] if not df.empty else df
+            df[dst] = pd.to_numeric(df[dst], errors="coerce").fillna(0).astype(INT_DTYPE)
+    return df[["season"] + DB_COLS] if not df.empty else df
+
+
+def db_career_by_season_bulk(conn: sqlite3.Connection, player_ids: List[str]) -> Dict[str, pd.DataFrame]:
+    """Aggregate Regular Season totals for many players in one scan of game_summary.
+
+    Returns a dict keyed by player_id with the same shape as db_career_by_season.
+    """
+    out: Dict[str, pd.DataFrame] = {}
+    chunk_size = 500  # stay under SQLite's default host-parameter limit
+    ids = list(player_ids)
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        placeholders = ",".join("?" * len(chunk))
+        sql = f"""
+          SELECT player_id AS player_id,
+                 season AS season,
+                 COALESCE(SUM(points), 0)   AS points,
+                 COALESCE(SUM(rebounds), 0) AS rebounds,
+                 COALESCE(SUM(assists), 0)  AS assists,
+                 COALESCE(SUM(steals), 0)   AS steals,
+                 COALESCE(SUM(blocks), 0)   AS blocks
+          FROM game_summary
+          WHERE season_type = 'Regular Season' AND player_id IN ({placeholders})
+          GROUP BY player_id, season
+        """
+        df = pd.read_sql_query(sql, conn, params=chunk)
+        if df.empty:
+            continue
+        df["player_id"] = df["player_id"].astype(str)
+        df["season"] = df["season"].astype(str)
+        for _, dst in METRICS:
+            df[dst] = pd.to_numeric(df[dst], errors="coerce").fillna(0).astype(INT_DTYPE)
+        for pid, sub in df.groupby("player_id"):
+            out[pid] = sub[["season"] + DB_COLS].reset_index(drop=True)
+    return out
 
 
 def get_player_name(conn: sqlite3.Connection, player_id: str, fallback_df: pd.DataFrame) -> str:
@@ -175,11 +306,11 @@ def render_reports(player_id: str, player_name: str, merged: pd.DataFrame) -> No
         # Table header
         f.write("Season | " + " | ".join([f"NBA {m}" for m, _ in METRICS]) + " | " + " | ".join([f"DB {m}" for m, _ in METRICS]) + " | " + " | ".join([f"Δ {m}" for m, _ in METRICS]) + "\n")
         f.write("---|" + "---:" * (len(METRICS) * 3 + 1) + "\n")
-        for _, r in merged.sort_values("season").iterrows():
-            nba_vals = [str(int(r.get(f"NBA_{m}", 0))) for m, _ in METRICS]
-            db_vals = [str(int(r.get(f"DB_{dst}", 0))) for _, dst in METRICS]
-            deltas = [str(int(r.get(f"DELTA_{dst}", 0))) for _, dst in METRICS]
-            f.write(f"{r['season']}|" + "|".join(nba_vals) + "|" + "|".join(db_vals) + "|" + "|".join(deltas) + "\n")
+        # Emit the whole table in one vectorized string build instead of per-row casts
+        cols = ["season"] + NBA_PREFIXED + DB_PREFIXED + DELTA_COLS
+        table = merged.sort_values("season").reindex(columns=cols, fill_value=0)
+        body = table.astype(str).agg("|".join, axis=1).str.cat(sep="\n")
+        f.write(body + "\n")
 
     print(f"Wrote: {csv_path}\nWrote: {md_path}")
 
@@ -194,22 +325,37 @@ def main():
 
     conn = sqlite3.connect(DB_PATH)
     try:
+        configure_sqlite(conn)
+        ensure_indexes(conn)
         nba_df = nba_career_by_season(player_id)
         db_df = db_career_by_season(conn, player_id)
 
         # Prepare merged view
         nba_df = nba_df.rename(columns={m: f"NBA_{m}" for m, _ in METRICS})
         if db_df is None or db_df.empty:
-            db_df = pd.DataFrame(columns=["season"] + [dst for _, dst in METRICS])
+            db_df = pd.DataFrame(columns=["season"] + DB_COLS)
         db_df = db_df.rename(columns={dst: f"DB_{dst}" for _, dst in METRICS})
 
-        merged = pd.merge(nba_df, db_df, on="season", how="outer")
-        # Presence flags
-        merged["NBA_present"] = ~merged[[f"NBA_{m}" for m, _ in METRICS]].isna().all(axis=1)
-        merged["DB_present"] = ~merged[[f"DB_{dst}" for _, dst in METRICS]].isna().all(axis=1)
-        # Fill NA with 0 for numeric comparisons
-        for col in [c for c in merged.columns if c.startswith("NBA_") or c.startswith("DB_")]:
-            merged[col] = pd.to_numeric(merged[col], errors="coerce").fillna(0).astype(int)
+        # Presence comes from the season sets; reindex both sides onto their union
+        nba_seasons = set(nba_df["season"].astype(str))
+        db_seasons = set(db_df["season"].astype(str))
+        all_seasons = sorted(nba_seasons | db_seasons)
+
+        nba_cols = NBA_PREFIXED + ["GP"]
+        db_cols = DB_PREFIXED
+        nba_part = nba_df.assign(season=nba_df["season"].astype(str)).set_index("season")[nba_cols]
+        db_part = db_df.assign(season=db_df["season"].astype(str)).set_index("season")[db_cols]
+        # Career frames can carry one row per team in trade seasons; keep one per season
+        nba_part = nba_part[~nba_part.index.duplicated(keep="last")]
+        db_part = db_part[~db_part.index.duplicated(keep="last")]
+        nba_part = nba_part.reindex(all_seasons).fillna(0).astype(INT_DTYPE)
+        db_part = db_part.reindex(all_seasons).fillna(0).astype(INT_DTYPE)
+
+        merged = pd.concat([nba_part, db_part], axis=1)
+        merged.index.name = "season"
+        merged = merged.reset_index()
+        merged["NBA_present"] = merged["season"].isin(nba_seasons)
+        merged["DB_present"] = merged["season"].isin(db_seasons)
         # Deltas
         for (m, dst) in METRICS:
             merged[f"DELTA_{dst}"] = merged[f"DB_{dst}"] - merged[f"NBA_{m}"]
@@ -1,8 +1,9 @@
 import os
 import sys
 import sqlite3
-from typing import Dict
+from typing import List
 
+import numpy as np
 import pandas as pd
 
 # Ensure this scripts directory is importable for sibling modules
@@ -10,7 +11,16 @@ SCRIPT_DIR = os.path.dirname(__file__)
 if SCRIPT_DIR not in sys.path:
     sys.path.append(SCRIPT_DIR)
 
-from coverage_scan_single import nba_career_by_season, db_career_by_season, METRICS, DB_PATH
+from coverage_scan_single import (
+    nba_career_by_season,
+    db_career_by_season,
+    configure_sqlite,
+    INT_DTYPE,
+    METRICS,
+    NBA_COLS,
+    DB_COLS,
+    DB_PATH,
+)
 
 
 def ensure_table(conn: sqlite3.Connection) -> None:
@@ -33,29 +43,34 @@ def ensure_table(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def upsert_override(conn: sqlite3.Connection, player_id: str, season: str, deltas: Dict[str, int]) -> None:
+UPSERT_SQL = """
+    INSERT INTO season_totals_override (player_id, season, season_type, points, rebounds, assists, steals, blocks)
+    VALUES (?, ?, 'Regular Season', ?, ?, ?, ?, ?)
+    ON CONFLICT(player_id, season, season_type) DO UPDATE SET
+      points=excluded.points,
+      rebounds=excluded.rebounds,
+      assists=excluded.assists,
+      steals=excluded.steals,
+      blocks=excluded.blocks
+"""
+
+# First-run bulk load into an empty table needs no conflict handling
+INSERT_SQL = """
+    INSERT INTO season_totals_override (player_id, season, season_type, points, rebounds, assists, steals, blocks)
+    VALUES (?, ?, 'Regular Season', ?, ?, ?, ?, ?)
+"""
+
+
+def upsert_overrides_many(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+    """Upsert override rows in one transaction. rows: (player_id, season, pts, reb, ast, stl, blk)."""
+    if not rows:
+        return
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO season_totals_override (player_id, season, season_type, points, rebounds, assists, steals, blocks)
-        VALUES (?, ?, 'Regular Season', ?, ?, ?, ?, ?)
-        ON CONFLICT(player_id, season, season_type) DO UPDATE SET
-          points=excluded.points,
-          rebounds=excluded.rebounds,
-          assists=excluded.assists,
-          steals=excluded.steals,
-          blocks=excluded.blocks
-        """,
-        (
-            player_id,
-            season,
-            int(deltas.get("points", 0)),
-            int(deltas.get("rebounds", 0)),
-            int(deltas.get("assists", 0)),
-            int(deltas.get("steals", 0)),
-            int(deltas.get("blocks", 0)),
-        ),
-    )
+    cur.execute("SELECT 1 FROM season_totals_override LIMIT 1")
+    sql = UPSERT_SQL if cur.fetchone() else INSERT_SQL
+    cur.execute("BEGIN")
+    cur.executemany(sql, rows)
+    conn.commit()
 
 
 def main():
@@ -66,38 +81,42 @@ def main():
     player_id = str(sys.argv[1])
     conn = sqlite3.connect(DB_PATH)
     try:
+        configure_sqlite(conn)
         ensure_table(conn)
 
         nba_df = nba_career_by_season(player_id)
         db_df = db_career_by_season(conn, player_id)
         if db_df is None or db_df.empty:
-            db_df = pd.DataFrame(columns=["season"] + [dst for _, dst in METRICS])
+            db_df = pd.DataFrame(columns=["season"] + DB_COLS)
 
         # Rename columns to common names for merge
-        nba_df2 = nba_df.rename(columns={m: m for m, _ in METRICS})[["season"] + [m for m, _ in METRICS]]
-        db_df2 = db_df.rename(columns={dst: dst for _, dst in METRICS})[["season"] + [dst for _, dst in METRICS]]
+        nba_df2 = nba_df[["season"] + NBA_COLS]
+        db_df2 = db_df[["season"] + DB_COLS]
+
+        # Career frames can carry one row per team in trade seasons; keep one per
+        # season (last wins, which is the TOT row) so staged rows never collide on
+        # the (player_id, season, season_type) primary key
+        nba_df2 = nba_df2[~nba_df2["season"].astype(str).duplicated(keep="last")]
+        db_df2 = db_df2[~db_df2["season"].astype(str).duplicated(keep="last")]
 
         merged = pd.merge(nba_df2, db_df2, on="season", how="outer", suffixes=("_nba", "_db"))
         for m, dst in METRICS:
-            merged[f"{dst}_nba"] = pd.to_numeric(merged.get(f"{m}_nba", merged.get(m, 0)), errors="coerce").fillna(0).astype(int)
-            merged[f"{dst}_db"] = pd.to_numeric(merged.get(f"{dst}_db", merged.get(dst, 0)), errors="coerce").fillna(0).astype(int)
-
-        # Compute deltas: how much to add to DB to reach NBA totals
-        for _, row in merged.iterrows():
-            season = str(row["season"]) if not pd.isna(row.get("season")) else None
-            if not season:
+            merged[f"{dst}_nba"] = pd.to_numeric(merged.get(f"{m}_nba", merged.get(m, 0)), errors="coerce").fillna(0).astype(INT_DTYPE)
+            merged[f"{dst}_db"] = pd.to_numeric(merged.get(f"{dst}_db", merged.get(dst, 0)), errors="coerce").fillna(0).astype(INT_DTYPE)
+
+        # Compute deltas vectorized: how much to add to DB to reach NBA totals
+        nba_arr = merged[[f"{d}_nba" for d in DB_COLS]].to_numpy(dtype=np.int64)
+        db_arr = merged[[f"{d}_db" for d in DB_COLS]].to_numpy(dtype=np.int64)
+        deltas_arr = nba_arr - db_arr
+        mask = (deltas_arr != 0).any(axis=1)
+        seasons = merged.loc[mask, "season"].astype(str).to_numpy()
+
+        rows: List[tuple] = []
+        for season, row_deltas in zip(seasons, deltas_arr[mask]):
+            if not season or season == "nan":
                 continue
-            deltas = {}
-            nonzero = False
-            for m, dst in METRICS:
-                delta = int(row[f"{dst}_nba"]) - int(row[f"{dst}_db"])  # NBA - DB
-                deltas[dst] = delta
-                if delta != 0:
-                    nonzero = True
-            if nonzero:
-                upsert_override(conn, player_id, season, deltas)
-
-        conn.commit()
+            rows.append((player_id, season, *(int(d) for d in row_deltas)))
+        upsert_overrides_many(conn, rows)
         print(f"Overrides computed and upserted for player {player_id}.")
 
     finally:
@@ -10,6 +10,15 @@ import time
 from datetime import datetime
 from typing import List, Dict, Optional
 
+import numpy as np
+import pandas as pd
+
+# Optional: JIT the age kernel when numba is installed; pandas path otherwise
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 try:
     from nba_api.stats.endpoints import playergamelog
     from nba_api.stats.static import players as nba_players
@@ -24,6 +33,40 @@ except ImportError:
     sys.exit(1)
 
 
+def install_shared_session() -> None:
+    """Reuse one pooled HTTPS session across nba_api calls so keep-alive amortizes TLS handshakes."""
+    try:
+        import requests
+        from nba_api.stats.library.http import NBAStatsHTTP
+
+        session = requests.Session()
+        session.mount(
+            'https://',
+            requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=16),
+        )
+        if hasattr(NBAStatsHTTP, 'set_session'):
+            NBAStatsHTTP.set_session(session)
+        else:
+            NBAStatsHTTP._session = session
+    except Exception:
+        # Non-fatal: fall back to nba_api's per-call connections
+        pass
+
+
+install_shared_session()
+
+
+INSERT_GAME_SQL = """
+    INSERT INTO game_summary (
+        player_id, player_name, game_id, game_date, season, season_type,
+        points, rebounds, assists, blocks, steals, age_at_game_years
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Commit in chunks: every commit is a network round-trip on Turso
+COMMIT_EVERY_PLAYERS = 25
+
+
 def get_current_season() -> str:
     """Get current NBA season string (e.g., '2025-26')"""
     now = datetime.now()
@@ -36,22 +79,46 @@ def get_current_season() -> str:
     return f"{season_start}-{season_end}"
 
 
-def calculate_age_at_game(birthdate: str, game_date: str) -> Optional[int]:
-    """Calculate player's age at game date"""
-    try:
-        birth = datetime.strptime(birthdate, "%Y-%m-%d")
-        game = datetime.strptime(game_date, "%Y-%m-%d")
-        
-        age = game.year - birth.year
-        if game.month < birth.month or (game.month == birth.month and game.day < birth.day):
-            age -= 1
-        
-        return age
-    except:
-        return None
+if njit is not None:
+    @njit(cache=True)
+    def _ages_kernel(by, bm, bd, gy, gm, gd):  # pragma: no cover - compiled
+        out = np.empty(gy.size, np.int32)
+        for i in range(gy.size):
+            a = gy[i] - by
+            if gm[i] < bm or (gm[i] == bm and gd[i] < bd):
+                a -= 1
+            out[i] = a
+        return out
+else:
+    _ages_kernel = None
+
 
+def compute_ages(birthdate: str, game_dates: pd.Series) -> List[Optional[int]]:
+    """Calculate player's age at every game date in one vectorized pass"""
+    birth = pd.to_datetime(birthdate, errors='coerce')
+    if pd.isna(birth):
+        return [None] * len(game_dates)
 
-def fetch_player_games(player_id: str, season: str, timeout: int = 15) -> List[Dict]:
+    game = pd.to_datetime(game_dates, errors='coerce')
+
+    if _ages_kernel is not None and not game.isna().any():
+        ages = _ages_kernel(
+            birth.year, birth.month, birth.day,
+            game.dt.year.to_numpy(np.int64),
+            game.dt.month.to_numpy(np.int64),
+            game.dt.day.to_numpy(np.int64),
+        )
+        return [int(a) for a in ages]
+
+    ages = game.dt.year - birth.year
+    before_birthday = (game.dt.month < birth.month) | (
+        (game.dt.month == birth.month) & (game.dt.day < birth.day)
+    )
+    ages = ages - before_birthday.astype('Int64')
+    return [None if pd.isna(a) else int(a) for a in ages]
+
+
+def fetch_player_games(player_id: str, season: str, timeout: int = 15) -> pd.DataFrame:
     """Fetch game logs for a player using nba_api with shorter timeout"""
     try:
         print(f"  Fetching games for player {player_id}, season {season}...")
@@ -68,19 +135,16 @@ def fetch_player_games(player_id: str, season: str, timeout: int = 15) -> List[D
         time.sleep(1.0)  # Increase delay between requests
         
         df = gamelog.get_data_frames()[0]
-        
-        # Convert DataFrame to list of dicts
-        games = df.to_dict('records')
-        print(f"  Found {len(games)} games")
-        return games
-        
+        print(f"  Found {len(df)} games")
+        return df
+
     except Exception as e:
         error_msg = str(e)
         if 'timeout' in error_msg.lower() or 'timed out' in error_msg.lower():
             print(f"  ⏱️  TIMEOUT - NBA API too slow, skipping player")
         else:
             print(f"  ERROR fetching games: {e}")
-        return []
+        return pd.DataFrame()
 
 
 def update_database(db_url: str, auth_token: str) -> Dict[str, int]:
@@ -90,6 +154,12 @@ def update_database(db_url: str, auth_token: str) -> Dict[str, int]:
     print(f"Connecting to Turso database...")
     conn = libsql.connect(database=db_url, auth_token=auth_token)
     cursor = conn.cursor()
+
+    # Let the WAL grow between checkpoints during the bulk load
+    try:
+        cursor.execute("PRAGMA wal_autocheckpoint=4000")
+    except Exception:
+        pass
     
     # Get current season
     season = get_current_season()
@@ -108,67 +178,80 @@ def update_database(db_url: str, auth_token: str) -> Dict[str, int]:
         'errors': 0
     }
     
+    pending: List[tuple] = []
+    players_since_commit = 0
+
     # Process each player
     for idx, (player_id, player_name, birthdate) in enumerate(active_players, 1):
         print(f"\n[{idx}/{len(active_players)}] Processing {player_name} ({player_id})...")
         
         try:
             # Fetch games from NBA API
-            games = fetch_player_games(player_id, season)
-            
-            for game in games:
-                game_id = game['Game_ID']
-                
-                # Check if game already exists
-                cursor.execute(
-                    "SELECT 1 FROM game_summary WHERE player_id = ? AND game_id = ? LIMIT 1",
-                    (player_id, game_id)
-                )
-                
-                if cursor.fetchone():
-                    stats['games_skipped'] += 1
-                    continue
-                
-                # Calculate age
-                game_date = game['GAME_DATE']
-                age = calculate_age_at_game(birthdate, game_date) if birthdate else None
-                
-                # Insert game
-                cursor.execute("""
-                    INSERT INTO game_summary (
-                        player_id, player_name, game_id, game_date, season, season_type,
-                        points, rebounds, assists, blocks, steals, age_at_game_years
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    player_id,
-                    player_name,
-                    game_id,
-                    game_date,
-                    season,
-                    'Regular Season',
-                    game.get('PTS', 0) or 0,
-                    game.get('REB', 0) or 0,
-                    game.get('AST', 0) or 0,
-                    game.get('BLK', 0) or 0,
-                    game.get('STL', 0) or 0,
-                    age
-                ))
-                
-                stats['games_added'] += 1
-            
-            conn.commit()
+            games_df = fetch_player_games(player_id, season)
+            total_games = len(games_df)
+
+            # One round-trip for all known game ids instead of a SELECT per game
+            cursor.execute(
+                "SELECT game_id FROM game_summary WHERE player_id = ?",
+                (player_id,)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+
+            if total_games:
+                games_df = games_df[~games_df['Game_ID'].isin(existing)]
+            stats['games_skipped'] += total_games - len(games_df)
+
+            rows = []
+            if len(games_df):
+                # Ages for the whole frame at once instead of strptime per game
+                ages = compute_ages(birthdate, games_df['GAME_DATE']) if birthdate else [None] * len(games_df)
+                cols = ['Game_ID', 'GAME_DATE', 'PTS', 'REB', 'AST', 'BLK', 'STL']
+                for (game_id, game_date, pts, reb, ast, blk, stl), age in zip(
+                    games_df[cols].itertuples(index=False, name=None), ages
+                ):
+                    rows.append((
+                        player_id,
+                        player_name,
+                        game_id,
+                        game_date,
+                        season,
+                        'Regular Season',
+                        int(pts or 0),
+                        int(reb or 0),
+                        int(ast or 0),
+                        int(blk or 0),
+                        int(stl or 0),
+                        age
+                    ))
+
+            pending.extend(rows)
+            stats['games_added'] += len(rows)
             stats['players_processed'] += 1
-            
-            print(f"  ✓ Added {stats['games_added']} games for {player_name}")
+            players_since_commit += 1
+
+            if players_since_commit >= COMMIT_EVERY_PLAYERS:
+                if pending:
+                    cursor.executemany(INSERT_GAME_SQL, pending)
+                    pending.clear()
+                conn.commit()
+                players_since_commit = 0
+
+            print(f"  ✓ Staged {len(rows)} games for {player_name}")
             
         except Exception as e:
             print(f"  ✗ ERROR processing {player_name}: {e}")
             stats['errors'] += 1
             continue
     
+    # Flush whatever is left from the final chunk
+    if pending:
+        cursor.executemany(INSERT_GAME_SQL, pending)
+        pending.clear()
+    conn.commit()
+
     cursor.close()
     conn.close()
-    
+
     return stats
 
 